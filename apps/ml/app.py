@@ -5,9 +5,17 @@ Flask REST API for pet health risk assessment.
 """
 
 import os
+
+# One BLAS/OpenMP thread per worker; concurrency comes from gunicorn workers.
+# Must be set before numpy/sklearn are imported via the inference service.
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+
 import logging
 from datetime import datetime
 
+import orjson
 from flask import Flask, request, jsonify
 from inference.inference_service import PetHealthInferenceService
 
@@ -35,6 +43,10 @@ def initialize_service():
     
     logger.info("Service initialized successfully")
 
+# Load the model at import time so gunicorn's preload_app loads it once in the
+# master process; forked workers then share the pages copy-on-write
+initialize_service()
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -65,14 +77,19 @@ def predict():
         # Make prediction
         result = inference_service.predict(data)
         
-        return jsonify(result), 200
+        # orjson encodes the response (including NumPy flag values) in C
+        return app.response_class(
+            orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY),
+            status=200,
+            mimetype='application/json'
+        )
         
     except ValueError as e:
-        logger.warning(f"Invalid input: {str(e)}")
+        logger.warning("Invalid input: %s", e)
         return jsonify({'error': str(e)}), 400
     
     except Exception as e:
-        logger.error(f"Prediction failed: {str(e)}")
+        logger.error("Prediction failed: %s", e)
         return jsonify({'error': 'Internal service error'}), 500
 
 @app.route('/model/info', methods=['GET'])
@@ -90,20 +107,17 @@ def not_found(error):
 
 @app.errorhandler(500)
 def internal_error(error):
-    logger.error(f"Internal server error: {str(error)}")
+    logger.error("Internal server error: %s", error)
     return jsonify({'error': 'Internal server error'}), 500
 
 def main():
-    """Run the Flask API server."""
+    """Run the Flask development server (production uses gunicorn_conf.py + wsgi.py)."""
     # Configuration from environment
     host = os.getenv('INFERENCE_HOST', '0.0.0.0')
     port = int(os.getenv('INFERENCE_PORT', 5000))
     debug = os.getenv('INFERENCE_DEBUG', 'false').lower() == 'true'
     
-    logger.info(f"Starting Pet Health ML API Server on {host}:{port}")
-    
-    # Initialize service before starting server
-    initialize_service()
+    logger.info("Starting Pet Health ML API Server on %s:%s", host, port)
     
     # Start Flask app
     app.run(host=host, port=port, debug=debug)
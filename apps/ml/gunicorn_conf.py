@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Pet Health ML API Server.
+Usage: gunicorn -c gunicorn_conf.py wsgi:app
+"""
+
+import multiprocessing
+import os
+
+# Bind to the same host/port settings as the development server
+bind = f"{os.getenv('INFERENCE_HOST', '0.0.0.0')}:{os.getenv('INFERENCE_PORT', 5000)}"
+
+# gevent workers yield on blocking socket I/O, so concurrent /predict
+# requests overlap instead of queueing behind a single thread
+worker_class = 'gevent'
+workers = int(os.getenv('INFERENCE_WORKERS', 2 * multiprocessing.cpu_count() + 1))
+worker_connections = 1000
+
+# Load the app (and model) once in the master; forked workers share it.
+# The model's NumPy arrays are memory-mapped (joblib mmap_mode='r'), so they
+# live in the kernel page cache once instead of in each worker's heap.
+preload_app = True
@@ -5,189 +5,524 @@ Core inference logic for pet health risk assessment.
 
 import json
 import logging
+import queue
+import threading
+import time
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
-import warnings
-warnings.filterwarnings('ignore')
+from typing import Annotated, Callable, Dict, Any, List, Literal, Optional, Sequence, Tuple
 
 import joblib
+import onnxruntime as ort
 import pandas as pd
 import numpy as np
+from scipy import sparse
+from pydantic import BaseModel, ConfigDict, Field, StrictBool, ValidationError
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder, StandardScaler
 
 logger = logging.getLogger(__name__)
 
+# Allowed (min, max) for numeric inputs, shared by the schema and its error messages
+NUMERIC_RANGES = {
+    'age_months': (0, 300),
+    'weight_kg': (0, 200),
+    'temperature_c': (30, 45),
+    'heart_rate_bpm': (10, 1000),
+    'respiratory_rate_bpm': (5, 200),
+    'symptom_count': (0, 20)
+}
+
+def _bounded(field: str):
+    """Numeric field constrained to its NUMERIC_RANGES interval."""
+    min_val, max_val = NUMERIC_RANGES[field]
+    return Annotated[float, Field(ge=min_val, le=max_val, allow_inf_nan=False)]
+
+class PetHealthInput(BaseModel):
+    """Input schema for /predict, validated by pydantic-core's compiled validator.
+    
+    Optional fields default to None without validation, so an omitted field
+    is filled at preprocessing while an explicit null is rejected.
+    """
+    model_config = ConfigDict(extra='ignore')
+    
+    # Required fields
+    species: Literal['dog', 'cat', 'bird', 'rabbit', 'hamster', 'fish', 'reptile', 'other']
+    symptoms_present: Any
+    symptom_count: _bounded('symptom_count')
+    
+    # Numeric ranges
+    age_months: _bounded('age_months') = None
+    weight_kg: _bounded('weight_kg') = None
+    temperature_c: _bounded('temperature_c') = None
+    heart_rate_bpm: _bounded('heart_rate_bpm') = None
+    respiratory_rate_bpm: _bounded('respiratory_rate_bpm') = None
+    
+    # Categorical fields
+    gender: Literal['male', 'female', 'unknown'] = None
+    max_symptom_severity: Literal['none', 'mild', 'moderate', 'severe'] = None
+    symptom_duration: Literal['none', 'less-than-day', '1-3-days', '4-7-days', 'more-than-week'] = None
+    appetite_level: Literal['normal', 'increased', 'decreased', 'none'] = None
+    energy_level: Literal['normal', 'high', 'low', 'lethargic'] = None
+    coat_condition: Literal['good', 'fair', 'poor'] = None
+    
+    # Boolean fields
+    is_senior: StrictBool = None
+    is_young: StrictBool = None
+    hydration_normal: StrictBool = None
+    gait_normal: StrictBool = None
+
+# Missing-value defaults (same as training, conservative for numerics)
+INPUT_DEFAULTS = {
+    # Categorical
+    'breed': 'Unknown',
+    'gender': 'unknown',
+    'symptoms_present': 'none',
+    'max_symptom_severity': 'none',
+    'symptom_duration': 'none',
+    'appetite_level': 'normal',
+    'energy_level': 'normal',
+    'coat_condition': 'good',
+    # Numeric
+    'age_months': 24,
+    'weight_kg': 5,
+    'temperature_c': 38.5,
+    'heart_rate_bpm': 120,
+    'respiratory_rate_bpm': 25,
+    'symptom_count': 0,
+    # Boolean
+    'is_senior': False,
+    'is_young': False,
+    'hydration_normal': True,
+    'gait_normal': True
+}
+
+# Risk categories the service may return; High and Critical raise the high-risk flag
+RISK_CATEGORIES = frozenset({'Low', 'Medium', 'High', 'Critical'})
+HIGH_RISK_CATEGORIES = frozenset({'High', 'Critical'})
+
+# Dynamic batching limits
+MAX_BATCH = 32
+BATCH_TIMEOUT_MS = 5
+BATCH_RESULT_TIMEOUT_S = 10
+
+# Repeat payloads (monitoring pings, dashboards) are answered from an LRU cache
+PREDICTION_CACHE_SIZE = 10_000
+_CACHEABLE_TYPES = (str, int, float, bool, type(None))
+
+# Prediction counts are logged as one aggregate line at most this often
+PREDICTION_LOG_INTERVAL_S = 1.0
+
+class BatchScheduler:
+    """Coalesces concurrent prediction requests into a single model call."""
+    
+    def __init__(self, predict_batch: Callable[[List[Dict[str, Any]]], Sequence[Any]],
+                 max_batch: int = MAX_BATCH, timeout_ms: float = BATCH_TIMEOUT_MS):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.timeout = timeout_ms / 1000.0
+        self._queue = None
+        self._worker = None
+        self._lock = threading.Lock()
+    
+    def submit(self, data: Dict[str, Any], timeout: float = BATCH_RESULT_TIMEOUT_S) -> Any:
+        """Queue a validated input and block until its batch has been scored."""
+        self._ensure_started()
+        
+        done = threading.Event()
+        result_slot = {}
+        self._queue.put((data, done, result_slot))
+        
+        if not done.wait(timeout):
+            raise TimeoutError("Timed out waiting for batched prediction")
+        if 'error' in result_slot:
+            raise result_slot['error']
+        
+        return result_slot['result']
+    
+    def _ensure_started(self):
+        """Start the worker thread on first use (and again after a fork)."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(
+                    target=self._run, name='batch-scheduler', daemon=True
+                )
+                self._worker.start()
+    
+    def _next_batch(self) -> List[Tuple[Dict[str, Any], threading.Event, Dict[str, Any]]]:
+        """Block for the first request, then admit more until the batch is full or times out."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.timeout
+        
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _run(self):
+        """Worker loop: score each batch once and scatter rows back to waiters."""
+        while True:
+            batch = self._next_batch()
+            
+            try:
+                results = self.predict_batch([data for data, _, _ in batch])
+            except Exception:
+                # Score items one by one so a bad input only fails its own request
+                self._run_individually(batch)
+                continue
+            
+            for (_, done, result_slot), result in zip(batch, results):
+                result_slot['result'] = result
+                done.set()
+    
+    def _run_individually(self, batch: List[Tuple[Dict[str, Any], threading.Event, Dict[str, Any]]]):
+        """Fallback after a failed batch: score each item separately."""
+        for data, done, result_slot in batch:
+            try:
+                result_slot['result'] = self.predict_batch([data])[0]
+            except Exception as e:
+                result_slot['error'] = e
+            done.set()
+
+class FeatureEncoder:
+    """NumPy/dict re-implementation of a fitted ColumnTransformer for the hot path.
+    
+    Supports StandardScaler, OneHotEncoder (handle_unknown='ignore', no infrequent
+    categories), OrdinalEncoder (handle_unknown='use_encoded_value') and passthrough
+    blocks; anything else stays on sklearn.
+    """
+    
+    def __init__(self, blocks: List[Tuple], n_outputs: int):
+        self.blocks = blocks
+        self.n_outputs = n_outputs
+    
+    @classmethod
+    def from_column_transformer(cls, transformer: Any, feature_names: List[str]) -> Optional['FeatureEncoder']:
+        """Compile a fitted ColumnTransformer, or return None if it uses unsupported steps."""
+        if not isinstance(transformer, ColumnTransformer):
+            return None
+        
+        feat_idx = {name: i for i, name in enumerate(feature_names)}
+        blocks = []
+        offset = 0
+        
+        for _, step, columns in transformer.transformers_:
+            if step == 'drop' or len(columns) == 0:
+                continue
+            if any(col not in feat_idx for col in columns):
+                return None
+            idx = np.array([feat_idx[col] for col in columns])
+            
+            # A single step followed by dtype casts compiles like the step alone
+            if isinstance(step, Pipeline):
+                inner = [s for _, s in step.steps
+                         if not (isinstance(s, FunctionTransformer) and s.func in (None, np.asarray))]
+                if len(inner) != 1:
+                    return None
+                step = inner[0]
+            
+            # Fitted 'passthrough' columns are stored as an identity FunctionTransformer;
+            # a plain np.asarray dtype cast encodes the same way
+            if step == 'passthrough' or (isinstance(step, FunctionTransformer) and step.func in (None, np.asarray)):
+                blocks.append(('numeric', idx, offset, 0.0, 1.0))
+                offset += len(idx)
+            
+            elif isinstance(step, StandardScaler):
+                mean = step.mean_ if step.with_mean else 0.0
+                scale = step.scale_ if step.with_std else 1.0
+                blocks.append(('numeric', idx, offset, mean, scale))
+                offset += len(idx)
+            
+            elif isinstance(step, OneHotEncoder):
+                if step.handle_unknown != 'ignore' or getattr(step, '_infrequent_enabled', False):
+                    return None
+                
+                # value -> output column, with the dropped category mapped to None
+                lookups = []
+                drop_idx = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(idx)
+                for categories, dropped in zip(step.categories_, drop_idx):
+                    lookup = {}
+                    position = offset
+                    for i, category in enumerate(categories):
+                        if i == dropped:
+                            lookup[category] = None
+                        else:
+                            lookup[category] = position
+                            position += 1
+                    lookups.append(lookup)
+                    offset = position
+                blocks.append(('onehot', idx, lookups))
+            
+            elif isinstance(step, OrdinalEncoder):
+                if step.handle_unknown != 'use_encoded_value' or getattr(step, '_infrequent_enabled', False):
+                    return None
+                
+                # value -> category code; unseen values get unknown_value, None the missing code
+                lookups = [
+                    {category: float(code) for code, category in enumerate(categories)}
+                    for categories in step.categories_
+                ]
+                blocks.append(('ordinal', idx, offset, lookups,
+                               float(step.unknown_value), float(step.encoded_missing_value)))
+                offset += len(idx)
+            
+            else:
+                return None
+        
+        return cls(blocks, offset)
+    
+    def transform(self, rows: np.ndarray) -> np.ndarray:
+        """Encode an object array of raw feature rows into the model's feature matrix."""
+        X = np.zeros((rows.shape[0], self.n_outputs), dtype=np.float64)
+        
+        for block in self.blocks:
+            if block[0] == 'numeric':
+                _, idx, offset, mean, scale = block
+                X[:, offset:offset + len(idx)] = (rows[:, idx].astype(np.float64) - mean) / scale
+            elif block[0] == 'ordinal':
+                _, idx, offset, lookups, unknown, missing = block
+                for j, (col, lookup) in enumerate(zip(idx, lookups)):
+                    X[:, offset + j] = [
+                        missing if value is None else lookup.get(value, unknown)
+                        for value in rows[:, col]
+                    ]
+            else:
+                _, idx, lookups = block
+                for col, lookup in zip(idx, lookups):
+                    for i, value in enumerate(rows[:, col]):
+                        position = lookup.get(value)
+                        if position is not None:
+                            X[i, position] = 1.0
+        
+        return X
+
 class PetHealthInferenceService:
     """Production ML inference service for pet health risk assessment."""
     
     def __init__(self, models_dir: str = "models"):
         self.models_dir = Path(models_dir)
         self.model = None
-        self.target_encoder = None
+        self._transformer = None
+        self._encoder = None
+        self._classifier = None
+        self._ort_session = None
+        self._ort_input = None
+        self._class_names = None
         self.metadata = None
         self.feature_names = None
         self.model_version = None
         
         # Safety constraints
-        self.ALLOWED_RISK_CATEGORIES = ['Low', 'Medium', 'High', 'Critical']
+        self.ALLOWED_RISK_CATEGORIES = RISK_CATEGORIES
         self.HIGH_RISK_THRESHOLD = 0.5
+        self.CONFIDENCE_THRESHOLD = 0.7
+        self._risk_labels = None
+        self._high_risk_mask = None
+        
+        # Concurrent requests are scored together in one predict_proba call
+        self.batch_scheduler = BatchScheduler(self.score_batch)
+        self._predict_cached = lru_cache(maxsize=PREDICTION_CACHE_SIZE)(self._predict_uncached)
+        
+        # Aggregated prediction counts for monitoring
+        self._prediction_counts = Counter()
+        self._counts_lock = threading.Lock()
+        self._counts_flushed_at = time.monotonic()
         
     def load_latest_model(self) -> bool:
         """Load the latest trained model artifacts."""
         try:
-            # Find latest model files
-            model_files = list(self.models_dir.glob("pet_health_model_*.joblib"))
-            if not model_files:
-                logger.error("No model files found in models directory")
-                return False
-            
-            latest_model_file = max(model_files, key=lambda x: x.stat().st_mtime)
+            # Follow the "latest" symlink maintained by training; scan only if it is absent
+            latest_link = self.models_dir / "latest.joblib"
+            if latest_link.is_symlink() and latest_link.exists():
+                latest_model_file = latest_link.resolve()
+            else:
+                model_files = list(self.models_dir.glob("pet_health_model_*.joblib"))
+                if not model_files:
+                    logger.error("No model files found in models directory")
+                    return False
+                
+                latest_model_file = max(model_files, key=lambda x: x.stat().st_mtime)
             timestamp = latest_model_file.stem.split('_')[-2] + '_' + latest_model_file.stem.split('_')[-1]
             
             # Load model artifacts
             model_path = latest_model_file
             metadata_path = self.models_dir / f"model_metadata_{timestamp}.json"
-            encoder_path = self.models_dir / f"target_encoder_{timestamp}.joblib"
             
             # Validate all required files exist
-            required_files = [model_path, metadata_path, encoder_path]
+            required_files = [model_path, metadata_path]
             for file_path in required_files:
                 if not file_path.exists():
-                    logger.error(f"Required artifact missing: {file_path}")
+                    logger.error("Required artifact missing: %s", file_path)
                     return False
             
-            # Load artifacts
-            self.model = joblib.load(model_path)
-            self.target_encoder = joblib.load(encoder_path)
+            # Load artifacts (NumPy arrays memory-mapped from the page cache, shared across workers)
+            self.model = joblib.load(model_path, mmap_mode='r')
+            
+            # Prefer the ONNX export of the classifier when it was produced
+            onnx_path = self.models_dir / f"pet_health_model_{timestamp}.onnx"
+            self._load_onnx(onnx_path if onnx_path.exists() else None)
             
             with open(metadata_path, 'r') as f:
                 self.metadata = json.load(f)
             
             self.feature_names = self.metadata['feature_names']
             self.model_version = timestamp
+            self._build_input_template()
+            self._split_pipeline()
+            self._load_risk_labels()
+            self._predict_cached.cache_clear()
             
-            logger.info(f"Model loaded successfully: version {self.model_version}")
-            logger.info(f"Features: {len(self.feature_names)}")
-            logger.info(f"Target classes: {self.metadata['target_classes']}")
+            logger.info("Model loaded successfully: version %s", self.model_version)
+            logger.info("Features: %d", len(self.feature_names))
+            logger.info("Target classes: %s", self.metadata['target_classes'])
             
             return True
             
         except Exception as e:
-            logger.error(f"Failed to load model: {str(e)}")
+            logger.error("Failed to load model: %s", e)
             return False
     
     def validate_input(self, data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Validate input data for safety and completeness."""
         try:
-            # Check required fields
-            required_fields = ['species', 'symptoms_present', 'symptom_count']
-            for field in required_fields:
-                if field not in data:
-                    return False, f"Missing required field: {field}"
-            
-            # Validate species
-            valid_species = ['dog', 'cat', 'bird', 'rabbit', 'hamster', 'fish', 'reptile', 'other']
-            if data['species'] not in valid_species:
-                return False, f"Invalid species: {data['species']}"
-            
-            # Validate numeric ranges
-            numeric_validations = {
-                'age_months': (0, 300),
-                'weight_kg': (0, 200),
-                'temperature_c': (30, 45),
-                'heart_rate_bpm': (10, 1000),
-                'respiratory_rate_bpm': (5, 200),
-                'symptom_count': (0, 20)
-            }
-            
-            for field, (min_val, max_val) in numeric_validations.items():
-                if field in data:
-                    try:
-                        value = float(data[field])
-                        if not (min_val <= value <= max_val):
-                            return False, f"Invalid {field}: {value} (must be {min_val}-{max_val})"
-                    except (ValueError, TypeError):
-                        return False, f"Invalid {field}: must be numeric"
-            
-            # Validate categorical fields
-            categorical_validations = {
-                'gender': ['male', 'female', 'unknown'],
-                'max_symptom_severity': ['none', 'mild', 'moderate', 'severe'],
-                'symptom_duration': ['none', 'less-than-day', '1-3-days', '4-7-days', 'more-than-week'],
-                'appetite_level': ['normal', 'increased', 'decreased', 'none'],
-                'energy_level': ['normal', 'high', 'low', 'lethargic'],
-                'coat_condition': ['good', 'fair', 'poor']
-            }
-            
-            for field, valid_values in categorical_validations.items():
-                if field in data and data[field] not in valid_values:
-                    return False, f"Invalid {field}: {data[field]}"
-            
-            # Validate boolean fields
-            boolean_fields = ['is_senior', 'is_young', 'hydration_normal', 'gait_normal']
-            for field in boolean_fields:
-                if field in data and not isinstance(data[field], bool):
-                    return False, f"Invalid {field}: must be boolean"
-            
+            PetHealthInput.model_validate(data)
             return True, None
             
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = error['loc'][0] if error['loc'] else 'input'
+            if error['type'] == 'missing':
+                return False, f"Missing required field: {field}"
+            # Echo the rejected value, with the allowed range for out-of-range numbers
+            value = error.get('input')
+            if error['type'] in ('greater_than_equal', 'less_than_equal', 'finite_number'):
+                min_val, max_val = NUMERIC_RANGES[field]
+                return False, f"Invalid {field}: {value} (must be {min_val}-{max_val})"
+            return False, f"Invalid {field}: {value} ({error['msg']})"
+            
         except Exception as e:
-            logger.error(f"Input validation error: {str(e)}")
+            logger.error("Input validation error: %s", e)
             return False, "Input validation failed"
     
-    def preprocess_input(self, data: Dict[str, Any]) -> pd.DataFrame:
-        """Preprocess input data for model inference."""
-        # Create DataFrame with all required features
-        df_data = {}
-        
-        # Fill in all expected features
-        for feature in self.feature_names:
-            if feature in data:
-                df_data[feature] = data[feature]
-            else:
-                df_data[feature] = None
-        
-        df = pd.DataFrame([df_data])
+    def _build_input_template(self):
+        """Pre-build a row of training-time defaults in feature order."""
+        self._feat_idx = {name: i for i, name in enumerate(self.feature_names)}
+        self._template_row = np.empty(len(self.feature_names), dtype=object)
+        for name, i in self._feat_idx.items():
+            self._template_row[i] = INPUT_DEFAULTS.get(name)
+    
+    def _fill_row(self, data: Dict[str, Any]) -> np.ndarray:
+        """Copy the default row and overwrite the provided features in place."""
+        row = self._template_row.copy()
+        for key, value in data.items():
+            i = self._feat_idx.get(key)
+            if i is not None and value is not None:
+                row[i] = value
+        return row
+    
+    def _load_onnx(self, onnx_path: Optional[Path]):
+        """Create an ONNX Runtime session for the classifier, or clear it."""
+        if onnx_path is None:
+            self._ort_session = None
+            self._ort_input = None
+            return
         
-        # Handle missing values (same as training)
-        df = df.fillna({
-            'breed': 'Unknown',
-            'gender': 'unknown',
-            'symptoms_present': 'none',
-            'max_symptom_severity': 'none',
-            'symptom_duration': 'none',
-            'appetite_level': 'normal',
-            'energy_level': 'normal',
-            'coat_condition': 'good'
-        })
+        # One intra-op thread: latency-bound small batches, one session per worker
+        sess_options = ort.SessionOptions()
+        sess_options.intra_op_num_threads = 1
+        self._ort_session = ort.InferenceSession(
+            str(onnx_path), sess_options, providers=['CPUExecutionProvider']
+        )
+        self._ort_input = self._ort_session.get_inputs()[0].name
+        logger.info("ONNX Runtime session loaded: %s", onnx_path.name)
+    
+    def _split_pipeline(self):
+        """Cache the fitted preprocessing steps and final classifier for direct calls."""
+        if isinstance(self.model, Pipeline) and len(self.model.steps) > 1:
+            steps = self.model.steps
+            self._transformer = steps[0][1] if len(steps) == 2 else self.model[:-1]
+            self._classifier = steps[-1][1]
+        else:
+            self._transformer = None
+            self._classifier = self.model
         
-        # Fill numeric columns with conservative defaults
-        numeric_defaults = {
-            'age_months': 24,
-            'weight_kg': 5,
-            'temperature_c': 38.5,
-            'heart_rate_bpm': 120,
-            'respiratory_rate_bpm': 25,
-            'symptom_count': 0
-        }
+        # Encode categoricals with dict lookups instead of sklearn transform dispatch
+        self._encoder = FeatureEncoder.from_column_transformer(self._transformer, self.feature_names)
+        logger.info("Feature encoding: %s", 'compiled lookups' if self._encoder else 'sklearn transformer')
         
-        for col, default_val in numeric_defaults.items():
-            if col in df.columns:
-                df[col] = df[col].fillna(default_val)
+        # Warm up so the transformers resolve their column indexers before serving
+        self.predict_proba_batch([{'species': 'dog'}])
+    
+    def predict_proba_batch(self, batch: List[Dict[str, Any]]) -> np.ndarray:
+        """Score a batch of validated inputs with a single model call."""
+        rows = np.vstack([self._fill_row(data) for data in batch])
+        if self._encoder is not None:
+            X = self._encoder.transform(rows)
+        else:
+            X = pd.DataFrame(rows, columns=self.feature_names)
+            if self._transformer is not None:
+                X = self._transformer.transform(X)
+            if sparse.issparse(X):
+                X = X.toarray()
         
-        # Fill boolean columns with safe defaults
-        boolean_defaults = {
-            'is_senior': False,
-            'is_young': False,
-            'hydration_normal': True,
-            'gait_normal': True
-        }
+        if self._ort_session is not None:
+            X = np.asarray(X, dtype=np.float32)
+            return self._ort_session.run(['probabilities'], {self._ort_input: X})[0]
+        return self._classifier.predict_proba(X)
+    
+    def _load_risk_labels(self):
+        """Map probability columns to safety-checked risk categories and high-risk flags."""
+        # Classifier classes are indices into the class names stored in the metadata
+        self._class_names = np.asarray(self.metadata['target_classes'])[self._classifier.classes_].tolist()
+        self._risk_labels = []
+        for label in self._class_names:
+            # Ensure risk category is valid (safety check)
+            if label not in self.ALLOWED_RISK_CATEGORIES:
+                logger.warning("Invalid risk category in model classes: %s", label)
+                label = 'Medium'
+            self._risk_labels.append(str(label))
+        self._high_risk_mask = np.array([label in HIGH_RISK_CATEGORIES for label in self._risk_labels])
+    
+    def score_batch(self, batch: List[Dict[str, Any]]) -> List[Tuple]:
+        """Score a batch and derive every row's class index and safety flags in one vectorized pass."""
+        probabilities = self.predict_proba_batch(batch)
         
-        for col, default_val in boolean_defaults.items():
-            if col in df.columns:
-                df[col] = df[col].fillna(default_val)
+        pred_idx = probabilities.argmax(axis=1)
+        confidence = probabilities[np.arange(len(pred_idx)), pred_idx]
+        high_risk = self._high_risk_mask[pred_idx]
+        requires_attention = high_risk & (confidence > self.HIGH_RISK_THRESHOLD)
+        threshold_met = confidence > self.CONFIDENCE_THRESHOLD
         
-        return df
+        return list(zip(probabilities, pred_idx, confidence, high_risk, requires_attention, threshold_met))
+    
+    def _canonical_key(self, data: Dict[str, Any]) -> Optional[Tuple]:
+        """Hashable, order-independent key of the model features, or None if not cacheable."""
+        items = []
+        for key in sorted(data):
+            if key not in self._feat_idx:
+                continue
+            value = data[key]
+            if not isinstance(value, _CACHEABLE_TYPES):
+                return None
+            items.append((key, value))
+        return tuple(items)
+    
+    def _predict_uncached(self, key: Tuple) -> Tuple:
+        """Score a canonical key through the batch scheduler (wrapped by the LRU cache)."""
+        return self.batch_scheduler.submit(dict(key))
     
     def predict(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform safe ML inference."""
@@ -197,45 +532,32 @@ class PetHealthInferenceService:
             if not is_valid:
                 raise ValueError(f"Input validation failed: {error_msg}")
             
-            # Preprocess input
-            df = self.preprocess_input(data)
-            
-            # Make prediction
-            prediction = self.model.predict(df)[0]
-            probabilities = self.model.predict_proba(df)[0]
-            
-            # Convert prediction to risk category
-            risk_category = self.target_encoder.inverse_transform([prediction])[0]
-            
-            # Ensure risk category is valid (safety check)
-            if risk_category not in self.ALLOWED_RISK_CATEGORIES:
-                logger.warning(f"Invalid risk category predicted: {risk_category}")
-                risk_category = 'Medium'
+            # Cached or batched prediction (preprocessing happens on the scheduler thread)
+            key = self._canonical_key(data)
+            if key is not None:
+                scored = self._predict_cached(key)
+            else:
+                scored = self.batch_scheduler.submit(data)
+            probabilities, pred_idx, confidence, is_high_risk, requires_attention, threshold_met = scored
+            risk_category = self._risk_labels[pred_idx]
             
-            # Create probability distribution
+            # Create probability distribution (rounded to 3 places, part of the API contract)
             prob_dict = {
-                class_name: float(prob) 
-                for class_name, prob in zip(self.target_encoder.classes_, probabilities)
+                class_name: round(float(prob), 3)
+                for class_name, prob in zip(self._class_names, probabilities)
             }
             
-            # Calculate confidence
-            confidence = float(max(probabilities))
-            
-            # Safety flags
-            is_high_risk = risk_category in ['High', 'Critical']
-            requires_attention = confidence > self.HIGH_RISK_THRESHOLD and is_high_risk
-            
             # Construct safe response
             response = {
                 'risk_assessment': {
                     'category': risk_category,
-                    'confidence': round(confidence, 3),
-                    'probability_distribution': {k: round(v, 3) for k, v in prob_dict.items()}
+                    'confidence': round(float(confidence), 3),
+                    'probability_distribution': prob_dict
                 },
                 'flags': {
                     'high_risk': is_high_risk,
                     'requires_attention': requires_attention,
-                    'confidence_threshold_met': confidence > 0.7
+                    'confidence_threshold_met': threshold_met
                 },
                 'metadata': {
                     'model_version': self.model_version,
@@ -245,15 +567,30 @@ class PetHealthInferenceService:
                 'safety_notice': 'This is a risk assessment only. Consult a veterinarian for medical advice.'
             }
             
-            # Log prediction for monitoring
-            logger.info(f"Prediction made: {risk_category} (confidence: {confidence:.3f})")
+            # Log prediction for monitoring (aggregated; per-prediction detail at DEBUG)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Prediction made: %s (confidence: %.3f)", risk_category, confidence)
+            self._record_prediction(risk_category)
             
             return response
             
         except Exception as e:
-            logger.error(f"Prediction error: {str(e)}")
+            logger.error("Prediction error: %s", e)
             raise
     
+    def _record_prediction(self, risk_category: str):
+        """Count a prediction and log the per-category totals at most once per interval."""
+        with self._counts_lock:
+            self._prediction_counts[risk_category] += 1
+            now = time.monotonic()
+            elapsed = now - self._counts_flushed_at
+            if elapsed < PREDICTION_LOG_INTERVAL_S:
+                return
+            counts, self._prediction_counts = self._prediction_counts, Counter()
+            self._counts_flushed_at = now
+        
+        logger.info("Predictions in last %.1fs: %s", elapsed, dict(counts))
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the loaded model."""
         if self.model is None:
@@ -1,8 +1,22 @@
 import pandas as pd
 import numpy as np
-import uuid
 from datetime import datetime
-import random
+
+HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+def random_uuids(rng, n):
+    """Generate n version-4 UUID strings from a single draw of random bytes."""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40  # version 4
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80  # RFC 4122 variant
+
+    digits = np.empty((n, 32), dtype=np.uint8)
+    digits[:, 0::2] = HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = HEX_DIGITS[raw & 0x0F]
+
+    # 8-4-4-4-12 layout, then view each 36-byte row as one string
+    chars = np.insert(digits, [8, 12, 16, 20], ord('-'), axis=1)
+    return chars.view('S36').ravel().astype(str)
 
 def generate_synthetic_data(num_samples=1000):
     print(f"Generating {num_samples} synthetic records...")
@@ -16,57 +30,50 @@ def generate_synthetic_data(num_samples=1000):
     energy_list = ['normal', 'low', 'lethargic', 'high']
     coat_list = ['good', 'fair', 'poor']
 
-    data = []
+    rng = np.random.default_rng()
+    n = num_samples
+
+    # Generate base features (one array per column)
+    species = rng.choice(species_list, size=n)
+    age_months = rng.integers(1, 181, size=n)
+
+    # Correlate risk factors slightly for realism
+    has_symptoms = rng.random(n) > 0.4
 
-    for _ in range(num_samples):
-        # Generate base features
-        species = random.choice(species_list)
-        age_months = random.randint(1, 180)
-        
-        # Correlate risk factors slightly for realism
-        has_symptoms = random.random() > 0.4
-        
-        if has_symptoms:
-            symptoms = random.choice(symptoms_list[1:])
-            severity = random.choice(severity_list[1:])
-            symptom_count = random.randint(1, 3)
-            risk_score = np.random.beta(5, 2) # Skew towards higher risk
-        else:
-            symptoms = 'none'
-            severity = 'none'
-            symptom_count = 0
-            risk_score = np.random.beta(1, 5) # Skew towards lower risk
+    symptoms = np.where(has_symptoms, rng.choice(symptoms_list[1:], size=n), 'none')
+    severity = np.where(has_symptoms, rng.choice(severity_list[1:], size=n), 'none')
+    symptom_count = np.where(has_symptoms, rng.integers(1, 4, size=n), 0)
 
-        # Normalize risk score to 0-1 strictly
-        risk_score = max(0.0, min(1.0, risk_score))
+    # Skew towards higher risk with symptoms, lower risk without
+    risk_score = np.where(has_symptoms, rng.beta(5, 2, size=n), rng.beta(1, 5, size=n))
 
-        record = {
-            'record_id': str(uuid.uuid4()),
-            'pet_id': str(uuid.uuid4()),
-            'species': species,
-            'breed': 'Unknown', # Simplified
-            'age_months': age_months,
-            'weight_kg': random.uniform(2, 40),
-            'gender': random.choice(['male', 'female', 'unknown']),
-            'is_senior': age_months > 96,
-            'is_young': age_months < 12,
-            'temperature_c': random.normalvariate(38.5, 0.5),
-            'heart_rate_bpm': random.randint(60, 140),
-            'respiratory_rate_bpm': random.randint(15, 40),
-            'symptoms_present': symptoms,
-            'symptom_count': symptom_count,
-            'max_symptom_severity': severity,
-            'symptom_duration': random.choice(duration_list),
-            'appetite_level': random.choice(appetite_list),
-            'energy_level': random.choice(energy_list),
-            'hydration_normal': random.choice([True, False]),
-            'gait_normal': random.choice([True, False]),
-            'coat_condition': random.choice(coat_list),
-            'risk_score': risk_score 
-        }
-        data.append(record)
+    # Normalize risk score to 0-1 strictly
+    risk_score = risk_score.clip(0.0, 1.0)
 
-    df = pd.DataFrame(data)
+    df = pd.DataFrame({
+        'record_id': random_uuids(rng, n),
+        'pet_id': random_uuids(rng, n),
+        'species': species,
+        'breed': 'Unknown', # Simplified
+        'age_months': age_months,
+        'weight_kg': rng.uniform(2, 40, size=n),
+        'gender': rng.choice(['male', 'female', 'unknown'], size=n),
+        'is_senior': age_months > 96,
+        'is_young': age_months < 12,
+        'temperature_c': rng.normal(38.5, 0.5, size=n),
+        'heart_rate_bpm': rng.integers(60, 141, size=n),
+        'respiratory_rate_bpm': rng.integers(15, 41, size=n),
+        'symptoms_present': symptoms,
+        'symptom_count': symptom_count,
+        'max_symptom_severity': severity,
+        'symptom_duration': rng.choice(duration_list, size=n),
+        'appetite_level': rng.choice(appetite_list, size=n),
+        'energy_level': rng.choice(energy_list, size=n),
+        'hydration_normal': rng.random(n) < 0.5,
+        'gait_normal': rng.random(n) < 0.5,
+        'coat_condition': rng.choice(coat_list, size=n),
+        'risk_score': risk_score
+    })
     
     # Save with timestamp to match training script expectation
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -4,38 +4,124 @@ Pet Health Risk Assessment ML Training Pipeline
 Trains models to predict health risk levels from pet health observations.
 """
 
+from __future__ import annotations
+
 import pandas as pd
 import numpy as np
+import os
 import json
 import pickle
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Tuple, Any, List
+from typing import TYPE_CHECKING, Dict, Tuple, Any, List
 import warnings
 warnings.filterwarnings('ignore')
 
-# ML imports
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.preprocessing import StandardScaler, LabelEncoder, OneHotEncoder
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, accuracy_score
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
+# ML imports (training-only scikit-learn, skl2onnx and joblib.Parallel imports are
+# deferred to the methods that use them, so PetHealthPredictor loads quickly)
+from scipy import sparse
 import joblib
 
+if TYPE_CHECKING:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+
+# Fill values for missing categorical features (training and PetHealthPredictor)
+CATEGORICAL_DEFAULTS = {
+    'breed': 'Unknown',
+    'gender': 'unknown',
+    'symptoms_present': 'none',
+    'max_symptom_severity': 'none',
+    'symptom_duration': 'none'
+}
+
+# Importances kept in the metadata JSON; the full vector goes to a .npz sidecar
+FEATURE_IMPORTANCE_TOP_K = 50
+
+def _fit_and_eval(name: str, model,
+                  X_train: np.ndarray, y_train: np.ndarray,
+                  X_val: np.ndarray, y_val: np.ndarray,
+                  X_test: np.ndarray, y_test: np.ndarray,
+                  class_names: List[str],
+                  param_grid: Dict[str, List[Any]] = None,
+                  auc_labels: np.ndarray = None,
+                  n_jobs: int = 1) -> Tuple[str, Dict[str, Any]]:
+    """Fit one candidate classifier on preprocessed features and evaluate it.
+    
+    Module-level so joblib workers can unpickle it. n_jobs is this candidate's
+    share of the cores for the grid search.
+    """
+    from joblib import parallel_config
+    from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
+    from sklearn.model_selection import GridSearchCV
+    
+    # Train model, searching the grid with CV folds fanned out across this candidate's cores
+    best_params = {}
+    if param_grid:
+        search = GridSearchCV(model, param_grid, cv=3, n_jobs=n_jobs, refit=True)
+        with parallel_config(backend='loky', n_jobs=n_jobs):
+            search.fit(X_train, y_train)
+        model = search.best_estimator_
+        best_params = search.best_params_
+    else:
+        model.fit(X_train, y_train)
+    
+    # Evaluate
+    train_score = model.score(X_train, y_train)
+    val_score = model.score(X_val, y_val)
+    test_score = model.score(X_test, y_test)
+    
+    # Predictions for detailed metrics
+    y_pred = model.predict(X_test)
+    y_pred_proba = model.predict_proba(X_test)
+    
+    # Calculate metrics
+    test_accuracy = accuracy_score(y_test, y_pred)
+    
+    # Multi-class AUC (one-vs-rest), only defined when every class is both in the
+    # test split and among the classifier's probability columns
+    if auc_labels is not None and y_pred_proba.shape[1] == len(auc_labels):
+        auc_score = roc_auc_score(y_test, y_pred_proba, multi_class='ovr',
+                                  labels=auc_labels, average='macro')
+    else:
+        auc_score = None
+    
+    return name, {
+        'classifier': model,
+        'best_params': best_params,
+        'train_score': train_score,
+        'val_score': val_score,
+        'test_score': test_score,
+        'test_accuracy': test_accuracy,
+        'auc_score': auc_score,
+        'predictions': y_pred,
+        'probabilities': y_pred_proba,
+        'classification_report': classification_report(
+            y_test, y_pred, 
+            labels=np.arange(len(class_names)),
+            target_names=class_names,
+            output_dict=True,
+            zero_division=0
+        )
+    }
+
 class PetHealthMLPipeline:
     def __init__(self, random_state: int = 42):
         self.random_state = random_state
         self.models = {}
         self.preprocessor = None
         self.feature_names = None
-        self.target_encoder = None
+        self.target_classes = None
+        self.feature_importance_full = None
+        self.validation_sets = {}
         
     def load_and_validate_data(self, data_path: str) -> pd.DataFrame:
         """Load dataset and perform validation checks."""
         print("Loading dataset...")
-        df = pd.read_csv(data_path)
+        # Sniff the header so identifier columns the model never uses are not decoded
+        columns = pd.read_csv(data_path, nrows=0).columns
+        usecols = [col for col in columns if col != 'record_id']
+        df = self.optimize_dtypes(pd.read_csv(data_path, engine='pyarrow', usecols=usecols))
         
         print(f"Dataset shape: {df.shape}")
         print(f"Unique pets: {df['pet_id'].nunique()}")
@@ -55,6 +141,29 @@ class PetHealthMLPipeline:
         print("Dataset validation passed")
         return df
     
+    def optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast numeric columns and store low-cardinality strings as categoricals.
+        
+        The risk_score target keeps full precision so values at the bin edges
+        land in the same risk category.
+        """
+        start_mb = df.memory_usage(deep=True).sum() / 1024**2
+        
+        for col in df.columns:
+            dtype = df[col].dtype
+            if col == 'risk_score' or pd.api.types.is_bool_dtype(dtype):
+                continue
+            if pd.api.types.is_integer_dtype(dtype):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+            elif pd.api.types.is_float_dtype(dtype):
+                df[col] = pd.to_numeric(df[col], downcast='float')
+            elif pd.api.types.is_string_dtype(dtype) and df[col].nunique() / len(df) < 0.5:
+                df[col] = df[col].astype('category')
+        
+        end_mb = df.memory_usage(deep=True).sum() / 1024**2
+        print(f"Memory usage: {start_mb:.2f} MB -> {end_mb:.2f} MB")
+        return df
+    
     def prepare_features(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
         """Prepare features and target variables."""
         # Define feature columns (exclude identifiers and targets)
@@ -63,77 +172,157 @@ class PetHealthMLPipeline:
         
         X = df[feature_cols].copy()
         
-        # Create risk category from risk_score for classification
+        # Create risk category from risk_score for classification; the ordered
+        # pd.cut codes are used directly as class indices into target_classes
+        self.target_classes = ['Low', 'Medium', 'High', 'Critical']
         y = pd.cut(df['risk_score'], 
                   bins=[0, 0.25, 0.5, 0.75, 1.0],
-                  labels=['Low', 'Medium', 'High', 'Critical'],
-                  include_lowest=True)
-        
-        # Handle missing values
-        X = X.fillna({
-            'breed': 'Unknown',
-            'gender': 'unknown',
-            'symptoms_present': 'none',
-            'max_symptom_severity': 'none',
-            'symptom_duration': 'none'
-        })
-        
-        # Fill numeric columns with median
-        numeric_cols = X.select_dtypes(include=[np.number]).columns
-        X[numeric_cols] = X[numeric_cols].fillna(X[numeric_cols].median())
+                  labels=self.target_classes,
+                  include_lowest=True).cat.codes.astype(np.int8)
+        
+        # Handle missing values: defaulted columns are filled as categoricals, so the
+        # fill works on integer codes (the default is added to the categories if absent)
+        for col, default in CATEGORICAL_DEFAULTS.items():
+            if col not in X:
+                continue
+            if not isinstance(X[col].dtype, pd.CategoricalDtype):
+                X[col] = X[col].astype('category')
+            if default not in X[col].cat.categories:
+                X[col] = X[col].cat.add_categories([default])
+        
+        # Numeric columns (read off the cached dtypes) are filled with their median,
+        # in the same single fillna pass as the categorical defaults
+        numeric_cols = [
+            col for col, dtype in X.dtypes.items()
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        ]
+        fill_map = {**CATEGORICAL_DEFAULTS, **X[numeric_cols].median().to_dict()}
+        X.fillna(fill_map, inplace=True)
         
         self.feature_names = feature_cols
         print(f"Features prepared: {len(feature_cols)} columns")
-        print(f"Target distribution:\n{y.value_counts()}")
+        print(f"Target distribution:\n{y.value_counts().rename(index=dict(enumerate(self.target_classes)))}")
         
         return X, y
     
-    def create_preprocessor(self, X: pd.DataFrame) -> ColumnTransformer:
-        """Create preprocessing pipeline."""
-        # Identify column types
+    def get_feature_types(self, X: pd.DataFrame) -> Tuple[List[str], List[str], List[str]]:
+        """Split feature columns into numeric, categorical and boolean groups."""
         numeric_features = X.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_features = X.select_dtypes(include=['object', 'bool']).columns.tolist()
+        categorical_features = X.select_dtypes(include=['object', 'category', 'bool']).columns.tolist()
         
         # Remove boolean columns from categorical (handle separately)
         bool_features = X.select_dtypes(include=['bool']).columns.tolist()
         categorical_features = [col for col in categorical_features if col not in bool_features]
         
+        return numeric_features, categorical_features, bool_features
+    
+    def create_preprocessor(self, X: pd.DataFrame) -> ColumnTransformer:
+        """Create preprocessing pipeline."""
+        from sklearn.compose import ColumnTransformer
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+        
+        # Identify column types
+        numeric_features, categorical_features, bool_features = self.get_feature_types(X)
+        
         print(f"Numeric features: {len(numeric_features)}")
         print(f"Categorical features: {len(categorical_features)}")
         print(f"Boolean features: {len(bool_features)}")
         
-        # Create preprocessing steps
+        # Scaled numerics are cast back to float32 so the whole matrix is single precision
+        # (np.asarray rather than a lambda, so the fitted pipeline stays picklable)
+        numeric_transformer = Pipeline([
+            ('scale', StandardScaler()),
+            ('cast', FunctionTransformer(np.asarray, kw_args={'dtype': np.float32}))
+        ])
+        
+        # Create preprocessing steps (one-hot block stays sparse; the scaler sees only
+        # the dense numeric columns, so it can still center them)
         preprocessor = ColumnTransformer(
             transformers=[
-                ('num', StandardScaler(), numeric_features),
-                ('cat', OneHotEncoder(drop='first', sparse_output=False, handle_unknown='ignore'), categorical_features),
-                ('bool', 'passthrough', bool_features)
+                ('num', numeric_transformer, numeric_features),
+                ('cat', OneHotEncoder(drop='first', sparse_output=True, handle_unknown='ignore', dtype=np.float32), categorical_features),
+                ('bool', FunctionTransformer(np.asarray, kw_args={'dtype': np.float32}), bool_features)
             ],
-            remainder='drop'
+            remainder='drop',
+            sparse_threshold=1.0,
+            n_jobs=-1
         )
         
         return preprocessor
     
-    def train_models(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
-        """Train multiple models and compare performance."""
-        # Split data
-        X_train, X_temp, y_train, y_temp = train_test_split(
-            X, y, test_size=0.4, random_state=self.random_state, stratify=y
-        )
-        X_val, X_test, y_val, y_test = train_test_split(
-            X_temp, y_temp, test_size=0.5, random_state=self.random_state, stratify=y_temp
-        )
+    def create_tree_preprocessor(self, X: pd.DataFrame) -> Tuple[ColumnTransformer, List[int]]:
+        """Create ordinal preprocessing for native categorical splits.
         
-        print(f"Train: {X_train.shape[0]}, Val: {X_val.shape[0]}, Test: {X_test.shape[0]}")
+        Returns the transformer and the output positions of the categorical columns.
+        """
+        from sklearn.compose import ColumnTransformer
+        from sklearn.preprocessing import OrdinalEncoder
         
-        # Create preprocessor
-        self.preprocessor = self.create_preprocessor(X_train)
+        numeric_features, categorical_features, bool_features = self.get_feature_types(X)
+        
+        # Trees don't need scaling; unseen categories are encoded as missing
+        preprocessor = ColumnTransformer(
+            transformers=[
+                ('num', 'passthrough', numeric_features),
+                ('cat', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan, dtype=np.float32), categorical_features),
+                ('bool', 'passthrough', bool_features)
+            ],
+            remainder='drop',
+            n_jobs=-1
+        )
         
-        # Encode target labels
-        self.target_encoder = LabelEncoder()
-        y_train_encoded = self.target_encoder.fit_transform(y_train)
-        y_val_encoded = self.target_encoder.transform(y_val)
-        y_test_encoded = self.target_encoder.transform(y_test)
+        categorical_idx = list(range(len(numeric_features), len(numeric_features) + len(categorical_features)))
+        return preprocessor, categorical_idx
+    
+    @staticmethod
+    def _feature_layout(X):
+        """Store dense feature matrices column-major float32; sparse CSR is left as is."""
+        if sparse.issparse(X):
+            return X
+        # Solvers and tree splitters scan one feature at a time, so keep columns contiguous
+        return np.asfortranarray(X, dtype=np.float32)
+    
+    def train_models(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+        """Train multiple models and compare performance."""
+        from joblib import Parallel, delayed
+        from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import StratifiedShuffleSplit
+        from sklearn.pipeline import Pipeline
+        
+        # Split data into stratified 60/20/20 train/val/test row indices, computed once
+        # (target labels are already integer class codes, see prepare_features)
+        y_codes = y.to_numpy()
+        first_split = StratifiedShuffleSplit(n_splits=1, test_size=0.4, random_state=self.random_state)
+        train_idx, temp_idx = next(first_split.split(np.zeros(len(y_codes)), y_codes))
+        second_split = StratifiedShuffleSplit(n_splits=1, test_size=0.5, random_state=self.random_state)
+        val_pos, test_pos = next(second_split.split(np.zeros(len(temp_idx)), y_codes[temp_idx]))
+        val_idx, test_idx = temp_idx[val_pos], temp_idx[test_pos]
+        
+        y_train_encoded = y_codes[train_idx]
+        y_val_encoded = y_codes[val_idx]
+        y_test_encoded = y_codes[test_idx]
+        
+        print(f"Train: {len(train_idx)}, Val: {len(val_idx)}, Test: {len(test_idx)}")
+        
+        # Create preprocessors
+        X_train = X.iloc[train_idx]
+        self.preprocessor = self.create_preprocessor(X_train)
+        tree_preprocessor, categorical_idx = self.create_tree_preprocessor(X_train)
+        
+        # Fit each preprocessor once on the training rows, transform the full frame in
+        # one pass and slice the splits out of the result by row index
+        transformed = {}
+        for key, preprocessor in (('onehot', self.preprocessor), ('tree', tree_preprocessor)):
+            preprocessor.fit(X_train)
+            Xt = preprocessor.transform(X)
+            transformed[key] = (
+                preprocessor,
+                self._feature_layout(Xt[train_idx]),
+                self._feature_layout(Xt[val_idx]),
+                self._feature_layout(Xt[test_idx])
+            )
         
         # Define models
         models_config = {
@@ -146,72 +335,86 @@ class PetHealthMLPipeline:
                 n_estimators=100,
                 random_state=self.random_state,
                 class_weight='balanced',
-                max_depth=10
+                max_depth=10,
+                max_features='sqrt',
+                n_jobs=1
             ),
-            'gradient_boosting': GradientBoostingClassifier(
-                n_estimators=100,
+            'hist_gradient_boosting': HistGradientBoostingClassifier(
+                max_iter=200,
                 random_state=self.random_state,
                 max_depth=6,
-                learning_rate=0.1
+                learning_rate=0.1,
+                early_stopping=True,
+                categorical_features=categorical_idx
             )
         }
         
-        results = {}
+        # Histogram boosting splits on ordinal codes instead of the one-hot matrix
+        feature_sets = {
+            name: transformed['tree' if name == 'hist_gradient_boosting' else 'onehot']
+            for name in models_config
+        }
         
-        for name, model in models_config.items():
-            print(f"\nTraining {name}...")
-            
-            # Create pipeline
-            pipeline = Pipeline([
-                ('preprocessor', self.preprocessor),
-                ('classifier', model)
-            ])
-            
-            # Train model
-            pipeline.fit(X_train, y_train_encoded)
-            
-            # Evaluate
-            train_score = pipeline.score(X_train, y_train_encoded)
-            val_score = pipeline.score(X_val, y_val_encoded)
-            test_score = pipeline.score(X_test, y_test_encoded)
-            
-            # Predictions for detailed metrics
-            y_pred = pipeline.predict(X_test)
-            y_pred_proba = pipeline.predict_proba(X_test)
-            
-            # Calculate metrics
-            test_accuracy = accuracy_score(y_test_encoded, y_pred)
-            
-            # Multi-class AUC (one-vs-rest)
-            try:
-                auc_score = roc_auc_score(y_test_encoded, y_pred_proba, multi_class='ovr')
-            except:
-                auc_score = None
-            
-            results[name] = {
-                'pipeline': pipeline,
-                'train_score': train_score,
-                'val_score': val_score,
-                'test_score': test_score,
-                'test_accuracy': test_accuracy,
-                'auc_score': auc_score,
-                'predictions': y_pred,
-                'probabilities': y_pred_proba,
-                'classification_report': classification_report(
-                    y_test_encoded, y_pred, 
-                    target_names=self.target_encoder.classes_,
-                    output_dict=True
-                )
+        # Small hyperparameter grids, searched with 3-fold CV on the training split
+        param_grids = {
+            'logistic_regression': {
+                'C': [0.1, 1.0, 10.0]
+            },
+            'random_forest': {
+                'max_depth': [6, 10, 16],
+                'n_estimators': [100, 300]
+            },
+            'hist_gradient_boosting': {
+                'max_depth': [3, 6],
+                'learning_rate': [0.05, 0.1]
             }
+        }
+        
+        # AUC needs every class present in the test split; resolve that once for all models
+        classes = np.arange(len(self.target_classes))
+        auc_labels = classes if np.unique(y_test_encoded).size == classes.size else None
+        
+        # Candidates are independent, so fit them concurrently in separate processes.
+        # Size the nesting once: each candidate's grid search gets an equal share of
+        # the cores and the forest fits single-threaded inside it
+        search_jobs = max(1, (os.cpu_count() or 1) // len(models_config))
+        print(f"\nTraining {', '.join(models_config)} in parallel...")
+        fitted = Parallel(n_jobs=len(models_config), backend='loky')(
+            delayed(_fit_and_eval)(
+                name, model,
+                feature_sets[name][1], y_train_encoded,
+                feature_sets[name][2], y_val_encoded,
+                feature_sets[name][3], y_test_encoded,
+                self.target_classes, param_grids.get(name), auc_labels, search_jobs
+            )
+            for name, model in models_config.items()
+        )
+        results = dict(fitted)
+        
+        for name, result in results.items():
+            # Wrap with the fitted preprocessor so saved models still take raw features
+            result['pipeline'] = Pipeline([
+                ('preprocessor', feature_sets[name][0]),
+                ('classifier', result.pop('classifier'))
+            ])
             
-            print(f"Train: {train_score:.3f}, Val: {val_score:.3f}, Test: {test_score:.3f}")
-            if auc_score:
-                print(f"AUC: {auc_score:.3f}")
+
+            print(f"\n{name}: Train: {result['train_score']:.3f}, Val: {result['val_score']:.3f}, Test: {result['test_score']:.3f}")
+            if result['auc_score']:
+                print(f"AUC: {result['auc_score']:.3f}")
+            if result['best_params']:
+                print(f"Best params: {result['best_params']}")
+        
+        # Keep each candidate's preprocessed validation split for permutation importance
+        self.validation_sets = {
+            name: (feature_sets[name][2], y_val_encoded)
+            for name in models_config
+        }
         
         # Store test data for final evaluation
         self.test_data = {
-            'X_test': X_test,
-            'y_test': y_test,
+            'X_test': X.iloc[test_idx],
+            'y_test': y.iloc[test_idx],
             'y_test_encoded': y_test_encoded
         }
         
@@ -251,7 +454,11 @@ class PetHealthMLPipeline:
         return best_model
     
     def analyze_feature_importance(self, model_name: str, pipeline: Pipeline) -> Dict[str, float]:
-        """Extract and analyze feature importance."""
+        """Extract feature importance, returning the top FEATURE_IMPORTANCE_TOP_K features.
+        
+        The full (names, importances) arrays are kept in feature_importance_full.
+        """
+        self.feature_importance_full = None
         model = pipeline.named_steps['classifier']
         
         # Get feature names after preprocessing
@@ -286,21 +493,74 @@ class PetHealthMLPipeline:
         elif hasattr(model, 'coef_'):
             # For logistic regression, use absolute values of coefficients
             importances = np.abs(model.coef_[0]) if len(model.coef_.shape) == 2 else np.abs(model.coef_)
+        elif model_name in self.validation_sets:
+            # No built-in importances (e.g. histogram boosting): measure the drop in
+            # validation score when each feature column is shuffled
+            from sklearn.inspection import permutation_importance
+            X_val, y_val = self.validation_sets[model_name]
+            if sparse.issparse(X_val):
+                X_val = X_val.toarray()
+            importances = permutation_importance(
+                model, X_val, y_val,
+                n_repeats=5,
+                random_state=self.random_state,
+                n_jobs=-1
+            ).importances_mean
         else:
             print(f"Cannot extract feature importance for {model_name}")
             return {}
         
-        # Create importance dictionary
-        if len(feature_names) == len(importances):
-            importance_dict = dict(zip(feature_names, importances))
-        else:
+        importances = np.asarray(importances, dtype=np.float64)
+        if len(importances) == 0:
+            return {}
+        if len(feature_names) != len(importances):
             # Fallback: use generic names
-            importance_dict = {f'feature_{i}': imp for i, imp in enumerate(importances)}
+            feature_names = [f'feature_{i}' for i in range(len(importances))]
+        names = np.asarray(feature_names, dtype=str)
+        self.feature_importance_full = (names, importances)
         
-        # Sort by importance
-        importance_dict = dict(sorted(importance_dict.items(), key=lambda x: x[1], reverse=True))
+        # Select the top-K in linear time, then sort only those
+        k = min(FEATURE_IMPORTANCE_TOP_K, len(importances))
+        top = np.argpartition(importances, -k)[-k:]
+        top = top[np.argsort(importances[top])[::-1]]
         
-        return importance_dict
+        return {str(names[i]): float(importances[i]) for i in top}
+    
+    def export_onnx(self, pipeline: Pipeline, onnx_path: Path) -> bool:
+        """Export the fitted classifier to ONNX (input is the preprocessed feature matrix)."""
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        
+        classifier = pipeline.named_steps['classifier']
+        
+        try:
+            onnx_model = convert_sklearn(
+                classifier,
+                initial_types=[('input', FloatTensorType([None, classifier.n_features_in_]))],
+                options={id(classifier): {'zipmap': False}}
+            )
+        except Exception as e:
+            # Converter errors can embed the whole model graph; keep the first line
+            reason = str(e).strip().split('\n', 1)[0][:200]
+            print(f"ONNX export skipped: {type(e).__name__}: {reason}")
+            return False
+        
+        with open(onnx_path, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
+        return True
+    
+    def update_latest_link(self, output_path: Path, model_path: Path):
+        """Atomically repoint the latest.joblib symlink used for model discovery."""
+        latest_path = output_path / "latest.joblib"
+        tmp_path = output_path / f".latest.joblib.{os.getpid()}"
+        try:
+            # Relative target keeps the link valid when the models directory is mounted elsewhere
+            os.symlink(model_path.name, tmp_path)
+            os.replace(tmp_path, latest_path)
+            print(f"Latest model link updated: {latest_path} -> {model_path.name}")
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            print(f"Latest model link not updated ({e}); inference will scan the models directory")
     
     def save_model_artifacts(self, best_model_name: str, results: Dict[str, Any], 
                            feature_importance: Dict[str, float], output_dir: str = "models"):
@@ -312,30 +572,51 @@ class PetHealthMLPipeline:
         
         # Save best model pipeline
         best_pipeline = results[best_model_name]['pipeline']
+        
+        # Training-time parallelism would make each single-row prediction fan out to
+        # threads (classifier) or worker processes (preprocessor blocks)
+        best_pipeline.named_steps['preprocessor'].set_params(n_jobs=None)
+        classifier = best_pipeline.named_steps['classifier']
+        if 'n_jobs' in classifier.get_params():
+            classifier.set_params(n_jobs=None)
+        
         model_path = output_path / f"pet_health_model_{timestamp}.joblib"
-        joblib.dump(best_pipeline, model_path)
+        # Uncompressed so inference can memory-map the arrays; joblib has no zstd codec
+        joblib.dump(best_pipeline, model_path, protocol=pickle.HIGHEST_PROTOCOL)
         print(f"Model saved: {model_path}")
         
-        # Save target encoder
-        encoder_path = output_path / f"target_encoder_{timestamp}.joblib"
-        joblib.dump(self.target_encoder, encoder_path)
-        print(f"Target encoder saved: {encoder_path}")
+        # Export classifier for ONNX Runtime serving
+        onnx_path = output_path / f"pet_health_model_{timestamp}.onnx"
+        if self.export_onnx(best_pipeline, onnx_path):
+            print(f"ONNX model saved: {onnx_path}")
+        else:
+            onnx_path = None
+        
+        # Save the full importance vector next to the metadata (which keeps the top-K)
+        importance_path = None
+        if self.feature_importance_full is not None:
+            importance_path = output_path / f"feature_importance_{timestamp}.npz"
+            names, importances = self.feature_importance_full
+            np.savez(importance_path, names=names, importances=importances)
+            print(f"Feature importance saved: {importance_path}")
         
         # Save model metadata
         metadata = {
             'model_type': best_model_name,
+            'best_params': results[best_model_name]['best_params'],
             'timestamp': timestamp,
             'feature_names': self.feature_names,
-            'target_classes': self.target_encoder.classes_.tolist(),
+            'target_classes': self.target_classes,
             'model_path': str(model_path),
-            'encoder_path': str(encoder_path),
+            'onnx_path': str(onnx_path) if onnx_path else None,
             'performance_metrics': {
                 'train_score': results[best_model_name]['train_score'],
                 'val_score': results[best_model_name]['val_score'],
                 'test_score': results[best_model_name]['test_score'],
                 'auc_score': results[best_model_name]['auc_score']
             },
-            'feature_importance': feature_importance
+            'feature_importance': feature_importance,
+            'feature_importance_path': str(importance_path) if importance_path else None
         }
         
         metadata_path = output_path / f"model_metadata_{timestamp}.json"
@@ -349,7 +630,8 @@ class PetHealthMLPipeline:
                 name: {
                     'val_score': result['val_score'],
                     'test_score': result['test_score'],
-                    'auc_score': result['auc_score']
+                    'auc_score': result['auc_score'],
+                    'best_params': result['best_params']
                 }
                 for name, result in results.items()
             },
@@ -362,6 +644,9 @@ class PetHealthMLPipeline:
             json.dump(evaluation, f, indent=2, default=str)
         print(f"Evaluation report saved: {eval_path}")
         
+        # Point models/latest.joblib at this run once all of its artifacts exist
+        self.update_latest_link(output_path, model_path)
+        
         return {
             'model_path': model_path,
             'metadata_path': metadata_path,
@@ -372,62 +657,87 @@ class PetHealthPredictor:
     """Production-ready inference interface."""
     
     def __init__(self, model_path: str, metadata_path: str):
-        self.model = joblib.load(model_path)
+        # Memory-map the fitted arrays (artifacts are saved uncompressed for this)
+        self.model = joblib.load(model_path, mmap_mode='r')
         
         with open(metadata_path, 'r') as f:
             self.metadata = json.load(f)
         
-        self.target_encoder = joblib.load(self.metadata['encoder_path'])
+        # Class codes index into the class names stored with the model
+        self.target_classes = np.asarray(self.metadata['target_classes'])
         self.feature_names = self.metadata['feature_names']
+        self._compile_feature_blocks()
+        self._class_names = self.target_classes[self._classifier.classes_].tolist()
+    
+    def _compile_feature_blocks(self):
+        """Pre-compute feature positions, the default row and per-block column indices."""
+        self._feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        
+        # Missing values: categorical defaults (same as training), fitted numeric
+        # features 0 (conservative)
+        preprocessor = self.model.named_steps['preprocessor']
+        numeric_features = set(preprocessor.named_transformers_['num'].feature_names_in_)
+        self._template_row = np.array([
+            0 if name in numeric_features else CATEGORICAL_DEFAULTS.get(name)
+            for name in self.feature_names
+        ], dtype=object)
+        
+        # (fitted transformer, column positions) in ColumnTransformer output order
+        self._blocks = [
+            (step, [self._feature_index[col] for col in columns])
+            for _, step, columns in preprocessor.transformers_
+            if not (isinstance(step, str) and step == 'drop') and len(columns) > 0
+        ]
+        self._classifier = self.model.named_steps['classifier']
+    
+    def _fill_rows(self, pet_data_list: List[Dict[str, Any]]) -> np.ndarray:
+        """Lay observations out as feature rows, filling each row independently."""
+        rows = np.tile(self._template_row, (len(pet_data_list), 1))
+        for i, pet_data in enumerate(pet_data_list):
+            for name, value in pet_data.items():
+                position = self._feature_index.get(name)
+                if position is not None and value is not None:
+                    rows[i, position] = value
+        return rows
     
     def predict_risk(self, pet_data: Dict[str, Any]) -> Dict[str, Any]:
         """Predict health risk for a single pet observation."""
-        # Convert to DataFrame
-        df = pd.DataFrame([pet_data])
-        
-        # Ensure all required features are present
-        for feature in self.feature_names:
-            if feature not in df.columns:
-                df[feature] = None
-        
-        # Select and order features
-        df = df[self.feature_names]
-        
-        # Handle missing values (same as training)
-        df = df.fillna({
-            'breed': 'Unknown',
-            'gender': 'unknown',
-            'symptoms_present': 'none',
-            'max_symptom_severity': 'none',
-            'symptom_duration': 'none'
-        })
-        
-        # Fill numeric columns with 0 (conservative)
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        df[numeric_cols] = df[numeric_cols].fillna(0)
-        
-        # Make prediction
-        prediction = self.model.predict(df)[0]
-        probabilities = self.model.predict_proba(df)[0]
+        return self.predict_risk_batch([pet_data])[0]
+    
+    def predict_risk_batch(self, pet_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Predict health risk for a batch of pet observations with one model call."""
+        rows = self._fill_rows(pet_data_list)
+        
+        # Run each fitted transformer on its column slice instead of building a
+        # DataFrame (the missing feature-name warning is silenced module-wide)
+        blocks = [step.transform(rows[:, idx]) for step, idx in self._blocks]
+        if any(sparse.issparse(block) for block in blocks):
+            features = sparse.hstack(blocks, format='csr')
+        else:
+            features = np.hstack(blocks)
         
-        # Convert back to labels
-        risk_category = self.target_encoder.inverse_transform([prediction])[0]
+        # Make predictions (predict is the argmax of predict_proba)
+        probabilities = self._classifier.predict_proba(features)
+        predictions = probabilities.argmax(axis=1)
         
-        # Create probability distribution
-        prob_dict = {
-            class_name: float(prob) 
-            for class_name, prob in zip(self.target_encoder.classes_, probabilities)
-        }
+        # Convert back to labels
+        risk_categories = [self._class_names[i] for i in predictions]
         
         # Calculate confidence (max probability)
-        confidence = float(max(probabilities))
-        
-        return {
-            'risk_category': risk_category,
-            'confidence': confidence,
-            'probability_distribution': prob_dict,
-            'model_version': self.metadata['timestamp']
-        }
+        confidences = probabilities.max(axis=1)
+        
+        return [
+            {
+                'risk_category': risk_category,
+                'confidence': float(confidence),
+                'probability_distribution': {
+                    class_name: float(prob)
+                    for class_name, prob in zip(self._class_names, row)
+                },
+                'model_version': self.metadata['timestamp']
+            }
+            for risk_category, confidence, row in zip(risk_categories, confidences, probabilities)
+        ]
 
 def main():
     # Initialize pipeline
@@ -499,6 +809,15 @@ def main():
     
     prediction = predictor.predict_risk(sample_data)
     print(f"Sample prediction: {prediction}")
+    
+    # Partial input: missing fields fall back to the training defaults
+    # (only histogram boosting accepts missing boolean flags)
+    flags = {name: sample_data[name] for name in ('is_senior', 'is_young', 'hydration_normal', 'gait_normal')}
+    partial_data = {'species': 'dog', 'symptoms_present': 'lethargy', 'symptom_count': 2, 'age_months': 30, **flags}
+    print(f"Partial prediction: {predictor.predict_risk(partial_data)}")
+    
+    batch = predictor.predict_risk_batch([partial_data, sample_data])
+    print(f"Batch prediction: {[result['risk_category'] for result in batch]}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
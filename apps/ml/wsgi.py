@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""
+Pet Health ML API WSGI Entry Point
+Production entry point for gunicorn: gunicorn -c gunicorn_conf.py wsgi:app
+"""
+
+# Importing app loads the model artifacts (see initialize_service in app.py)
+from app import app